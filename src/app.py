@@ -23,10 +23,10 @@ from module_config import load_config
 from module_character import CharacterManager
 from module_memory import MemoryManager
 from module_stt import STTManager
-from module_tts import update_tts_settings
+from module_tts import update_tts_settings, play_audio_stream
 from module_btcontroller import *
 from module_main import initialize_managers, wake_word_callback, utterance_callback, post_utterance_callback, start_bt_controller_thread
-from module_vision import initialize_blip
+from module_vision import warm_up_blip
 
 # === Constants and Globals ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -45,11 +45,14 @@ def init_app():
     print(f"LOAD: Script running from: {BASE_DIR}")
     #print(f"DEBUG: init_app() called")
     
-    # Load the configuration
-    CONFIG = load_config()
     if CONFIG['TTS']['ttsoption'] == 'xttsv2':
         update_tts_settings(CONFIG['TTS']['ttsurl'])
 
+    # Play a short burst of silence to open the audio device and warm up the playback path
+    # (only for backends that play through play_audio_stream; the others use aplay/sd.play)
+    if CONFIG['TTS']['ttsoption'] in ('xttsv2', 'azure'):
+        play_audio_stream(iter([b'\x00' * 8192]), gain=0.0)
+
 # === Main Application Logic ===
 if __name__ == "__main__":
     # Perform initial setup
@@ -75,17 +78,17 @@ if __name__ == "__main__":
     bt_controller_thread = threading.Thread(target=start_bt_controller_thread, name="BTControllerThread", daemon=True)
     bt_controller_thread.start()
 
-    # Initilize BLIP to speed up initial image capture
+    # Initilize and warm up BLIP to speed up initial image capture
     if not CONFIG['VISION']['server_hosted']:
-        initialize_blip()
+        warm_up_blip()
     
     try:
         print(f"LOAD: TARS-AI v1.00 running.")
         # Start the STT thread
         stt_manager.start()
 
-        while not shutdown_event.is_set():
-            time.sleep(0.1) # Sleep to reduce CPU usage
+        # Block until a shutdown is signalled (no polling)
+        shutdown_event.wait()
 
     except KeyboardInterrupt:
         print(f"INFO: Stopping all threads and shutting down executor...")
@@ -11,15 +11,18 @@ variables, providing a structured dictionary for easy access throughout the appl
 import os
 import sys
 import configparser
+from functools import lru_cache
 from dotenv import load_dotenv
 from datetime import datetime
 
 # === Initialization ===
 load_dotenv() # Load environment variables from .env file
 
+@lru_cache(maxsize=1)
 def load_config():
     """
     Load configuration settings from 'config.ini' and return them as a dictionary.
+    The file is parsed once; later calls return the same cached dictionary.
 
     Returns:
     - CONFIG (dict): Dictionary containing configuration settings.
@@ -68,6 +71,7 @@ def load_config():
         "VISION": {
             "server_hosted": config.getboolean('VISION', 'server_hosted'),
             "base_url": config['VISION']['base_url'],
+            "num_beams": config.getint('VISION', 'num_beams', fallback=1),
         },
         "EMOTION": {
             "enabled": config.getboolean('EMOTION', 'enabled'),
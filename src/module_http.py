@@ -0,0 +1,31 @@
+"""
+module_http.py
+
+HTTP Session Module for TARS-AI Application.
+
+Provides pooled keep-alive `requests` sessions so modules talking to the same
+servers (TTS, vision) reuse connections instead of reconnecting on every call.
+"""
+
+# === Standard Libraries ===
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def create_session(headers=None) -> requests.Session:
+    """
+    Create a requests Session with connection pooling and connect-only retries.
+
+    Parameters:
+    - headers (dict): Optional default headers for every request on the session.
+
+    Returns:
+    - requests.Session: Configured session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(connect=2, read=0, backoff_factor=0.2))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
@@ -25,6 +25,9 @@ import json
 from typing import Callable, Optional
 from vosk import SetLogLevel
 
+# === Custom Modules ===
+from module_tts import play_tone
+
 # Suppress Vosk logs by setting the log level to 0 (ERROR and above)
 SetLogLevel(-1)  # Adjust to 0 for minimal output or -1 to suppress all logs
 
@@ -441,13 +444,8 @@ class STTManager:
         - sample_rate (int): Sample rate in Hz (default: 44100).
         - volume (float): Volume of the beep (0.0 to 1.0).
         """
-        # Generate a sine wave
-        t = np.linspace(0, duration, int(sample_rate * duration), endpoint=False)
-        wave = volume * np.sin(2 * np.pi * frequency * t)
-        
-        # Play the sine wave
-        sd.play(wave, samplerate=sample_rate)
-        sd.wait()  # Wait until the sound finishes playing
+        # Play through the TTS output stream when it holds the device
+        play_tone(frequency, duration, sample_rate, volume)
 
 #Callbacks
     def set_wake_word_callback(self, callback: Callable[[str], None]):
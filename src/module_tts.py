@@ -11,8 +11,10 @@ Handles TTS functionality to convert text into audio using:
 """
 
 # === Standard Libraries ===
-import requests
-import os 
+import atexit
+import subprocess
+import threading
+import queue
 from datetime import datetime
 import azure.cognitiveservices.speech as speechsdk
 import numpy as np
@@ -20,6 +22,86 @@ import sounddevice as sd
 import soundfile as sf
 from io import BytesIO
 from module_piper import *
+from module_http import create_session
+
+# === Constants ===
+WRITE_BLOCK_FRAMES = 4096  # Frames handed to PortAudio per write in play_audio_stream
+HTTP_TIMEOUT = (5, 60)  # (connect, read) seconds for TTS server requests
+ALLTALK_GENERATE_TIMEOUT = (5, None)  # alltalk renders the whole file before replying, so no read limit
+AZURE_READ_BYTES = 8192  # Bytes pulled from the Azure audio stream per read
+TTS_QUEUE_CHUNKS = 8  # Downloaded chunks buffered ahead of playback in server_tts
+TTS_READER_STOP_TIMEOUT = 5  # Seconds server_tts waits for its reader thread after playback stops
+
+JSON_HEADERS = {
+    'Accept': 'application/json',
+    'Content-Type': 'application/json'
+}
+WAV_HEADERS = {'accept': 'audio/x-wav'}
+
+# Shared HTTP session so TTS requests reuse pooled keep-alive connections
+_SESSION = create_session()
+
+# Output streams kept open (but stopped) between utterances, keyed by (samplerate, channels)
+_OUTPUT_STREAMS = {}
+_OUTPUT_LOCK = threading.Lock()  # Serializes playback on the shared streams
+
+def get_output_stream(samplerate, channels):
+    """
+    Return a started int16 OutputStream for the given format, opening it on first use.
+    Reusing the stream avoids a PortAudio device open/close for every utterance;
+    callers stop it again when playback finishes so the device idles in between.
+
+    Parameters:
+    - samplerate: The sample rate of the audio data.
+    - channels: The number of audio channels.
+    """
+    key = (samplerate, channels)
+    stream = _OUTPUT_STREAMS.get(key)
+    if stream is None:
+        # Hold at most one device handle: release a stream opened for another format
+        close_output_streams()
+        stream = sd.OutputStream(samplerate=samplerate, channels=channels, dtype='int16', blocksize=2048, latency='high')
+        _OUTPUT_STREAMS[key] = stream
+    if stream.stopped:
+        stream.start()
+    return stream
+
+def close_output_streams():
+    """
+    Close all cached output streams.
+    """
+    while _OUTPUT_STREAMS:
+        _, stream = _OUTPUT_STREAMS.popitem()
+        stream.close(ignore_errors=True)
+
+atexit.register(close_output_streams)
+
+def play_tone(frequency, duration, samplerate, volume):
+    """
+    Play a sine tone, such as the STT listening beeps.
+    While play_audio_stream holds an output stream the tone is written to that stream,
+    since a second player cannot open an ALSA hw device that is already held.
+
+    Parameters:
+    - frequency (int): Frequency of the tone in Hz.
+    - duration (float): Duration of the tone in seconds.
+    - samplerate (int): Sample rate in Hz used when no stream is held.
+    - volume (float): Volume of the tone (0.0 to 1.0).
+    """
+    with _OUTPUT_LOCK:
+        held = next(iter(_OUTPUT_STREAMS), None)
+
+    if held is None:
+        t = np.linspace(0, duration, int(samplerate * duration), endpoint=False)
+        sd.play(volume * np.sin(2 * np.pi * frequency * t), samplerate=samplerate)
+        sd.wait()  # Wait until the sound finishes playing
+        return
+
+    # Render at the held stream's format and play through it
+    samplerate, channels = held
+    t = np.linspace(0, duration, int(samplerate * duration), endpoint=False)
+    tone = (volume * 32767 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+    play_audio_stream(iter([np.repeat(tone, channels).tobytes()]), samplerate=samplerate, channels=channels)
 
 def update_tts_settings(ttsurl):
     """
@@ -30,10 +112,6 @@ def update_tts_settings(ttsurl):
     """
 
     url = f"{ttsurl}/set_tts_settings"
-    headers = {
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
     payload = {
         "stream_chunk_size": 100,
         "temperature": 0.75,
@@ -46,7 +124,7 @@ def update_tts_settings(ttsurl):
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = _SESSION.post(url, headers=JSON_HEADERS, json=payload, timeout=HTTP_TIMEOUT)
         if response.status_code == 200:
             print(f"LOAD: TTS Settings updated successfully.")
         else:
@@ -58,6 +136,9 @@ def update_tts_settings(ttsurl):
 def play_audio_stream(tts_stream, samplerate=22050, channels=1, gain=1.0, normalize=False):
     """
     Play the audio stream through speakers using SoundDevice with volume/gain adjustment.
+
+    Incoming chunks are coalesced into fixed-size blocks so PortAudio is fed
+    a few large writes instead of one small write per network chunk.
     
     Parameters:
     - tts_stream: Stream of audio data in chunks.
@@ -67,27 +148,84 @@ def play_audio_stream(tts_stream, samplerate=22050, channels=1, gain=1.0, normal
     - normalize: Whether to normalize the audio to use the full dynamic range.
     """
     try:
-        with sd.OutputStream(samplerate=samplerate, channels=channels, dtype='int16', blocksize=4096) as stream:
+        # Raw int16 samples can go straight to the device when nothing needs scaling
+        passthrough = gain == 1.0 and not normalize
+
+        # Block buffer filled from the network chunks, viewed as int16 samples (no copy)
+        frame_bytes = 2 * channels
+        block_bytes = WRITE_BLOCK_FRAMES * frame_bytes
+        block_buf = bytearray(block_bytes)
+        block_view = memoryview(block_buf)
+        block_samples = np.frombuffer(block_buf, dtype=np.int16)
+        filled = 0
+
+        # Scratch buffers reused for every block
+        scratch_f32 = np.empty(block_samples.size, dtype=np.float32)
+        scratch_i32 = np.empty(block_samples.size, dtype=np.int32)
+        scratch_i16 = np.empty(block_samples.size, dtype=np.int16)
+
+        def write_block(stream, nbytes):
+            audio_data = block_samples[:nbytes // 2]
+
+            if not passthrough:
+                work_i16 = scratch_i16[:audio_data.size]
+
+                # Fold normalization into the gain so the block is scaled only once
+                scale = gain
+                scale_q15 = 0
+                if normalize:
+                    max_value = max(int(audio_data.max()), -int(audio_data.min())) or 1
+                    scale = gain * 32767 / max_value
+                    scale_q15 = int(gain * 32767 * 32768) // max_value
+
+                if 0 < scale_q15 and scale_q15 * max_value < 2 ** 31:
+                    # Fixed-point Q15 scaling in int32 whenever the products cannot overflow
+                    work_i32 = scratch_i32[:audio_data.size]
+                    np.multiply(audio_data, np.int32(scale_q15), out=work_i32)
+                    np.right_shift(work_i32, 15, out=work_i32)
+                    np.clip(work_i32, -32768, 32767, out=work_i32)
+                    np.copyto(work_i16, work_i32, casting='unsafe')
+                else:
+                    # Apply gain adjustment with int16 saturation into the scratch buffers
+                    work_f32 = scratch_f32[:audio_data.size]
+                    np.multiply(audio_data, np.float32(scale), out=work_f32, casting='unsafe')
+                    np.clip(work_f32, -32768, 32767, out=work_f32)
+                    np.copyto(work_i16, work_f32, casting='unsafe')
+                audio_data = work_i16
+
+            # Blocks in C until PortAudio has taken the whole block
+            stream.write(audio_data.reshape(-1, channels))
+
+        with _OUTPUT_LOCK:
+            stream = get_output_stream(samplerate, channels)
             for chunk in tts_stream:
                 if chunk:
-                    # Convert bytes to int16 using numpy
-                    audio_data = np.frombuffer(chunk, dtype='int16')
-                    
-                    # Normalize the audio (if enabled)
-                    if normalize:
-                        max_value = np.max(np.abs(audio_data))
-                        if max_value > 0:
-                            audio_data = audio_data / max_value * 32767
-                    
-                    # Apply gain adjustment
-                    audio_data = np.clip(audio_data * gain, -32768, 32767).astype('int16')
-
-                    # Write the adjusted audio data to the stream
-                    stream.write(audio_data)
+                    chunk_view = memoryview(chunk)
+                    while chunk_view:
+                        take = min(len(chunk_view), block_bytes - filled)
+                        block_view[filled:filled + take] = chunk_view[:take]
+                        chunk_view = chunk_view[take:]
+                        filled += take
+                        if filled == block_bytes:
+                            write_block(stream, filled)
+                            filled = 0
                 else:
                     print(f"ERROR: Received empty chunk.")
+
+            # Flush the tail, dropping any incomplete trailing frame
+            filled -= filled % frame_bytes
+            if filled:
+                write_block(stream, filled)
+
+            # Let the queued audio drain, then stop so the device is idle between utterances
+            stream.stop()
     except Exception as e:
         print(f"ERROR: Error during audio playback: {e}")
+        # Drop the cached stream so the next utterance reopens the device
+        with _OUTPUT_LOCK:
+            stream = _OUTPUT_STREAMS.pop((samplerate, channels), None)
+            if stream is not None:
+                stream.close(ignore_errors=True)
 
 def azure_tts(text, azure_api_key, azure_region, tts_voice):
     """
@@ -102,10 +240,12 @@ def azure_tts(text, azure_api_key, azure_region, tts_voice):
     try:
         # Initialize Azure Speech SDK
         speech_config = speechsdk.SpeechConfig(subscription=azure_api_key, region=azure_region)
-        audio_config = speechsdk.audio.AudioOutputConfig(use_default_speaker=True)
+        speech_config.set_speech_synthesis_output_format(
+            speechsdk.SpeechSynthesisOutputFormat.Raw22050Hz16BitMonoPcm
+        )
 
-        # Create a Speech Synthesizer
-        synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_config)
+        # Create a Speech Synthesizer without an audio sink; audio is pulled and played below
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
 
         # SSML Configuration
         ssml = f"""
@@ -118,17 +258,35 @@ def azure_tts(text, azure_api_key, azure_region, tts_voice):
         </speak>
         """
 
-        # Perform speech synthesis
-        result = synthesizer.speak_ssml_async(ssml).get()
+        # Start speech synthesis; returns as soon as the first audio is available
+        result = synthesizer.start_speaking_ssml_async(ssml).get()
 
         # Check for errors
-        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            pass
-        elif result.reason == speechsdk.ResultReason.Canceled:
+        if result.reason == speechsdk.ResultReason.Canceled:
             cancellation_details = result.cancellation_details
             print(f"ERROR: Speech synthesis canceled: {cancellation_details.reason}")
             if cancellation_details.error_details:
                 print(f"ERROR: Error details: {cancellation_details.error_details}")
+            return
+
+        # Stream the raw PCM into the shared playback path while synthesis continues
+        audio_stream = speechsdk.AudioDataStream(result)
+
+        def tts_stream():
+            buffer = bytes(AZURE_READ_BYTES)
+            while True:
+                read = audio_stream.read_data(buffer)
+                if read == 0:
+                    break
+                yield buffer[:read]
+
+        play_audio_stream(tts_stream())
+
+        if audio_stream.status == speechsdk.StreamStatus.Canceled:
+            cancellation_details = audio_stream.cancellation_details
+            print(f"ERROR: Speech synthesis canceled: {cancellation_details.reason}")
+            if cancellation_details.error_details:
+                print(f"ERROR: Error details: {cancellation_details.error_details}")
     except Exception as e:
         print(f"ERROR: Azure TTS generation failed: {e}")
 
@@ -151,7 +309,7 @@ def alltalk_tts(text, ttsurl, tts_voice):
         }
 
         #print("Generating audio on the server...")
-        response = requests.post(url, data=data)
+        response = _SESSION.post(url, data=data, timeout=ALLTALK_GENERATE_TIMEOUT)
         response.raise_for_status()
 
         wav_url = response.json().get("output_file_url")
@@ -163,7 +321,7 @@ def alltalk_tts(text, ttsurl, tts_voice):
 
         # Download the audio file into memory
         #print("Downloading WAV file...")
-        response = requests.get(wav_url)
+        response = _SESSION.get(wav_url, timeout=HTTP_TIMEOUT)
         response.raise_for_status()
 
         wav_data = BytesIO(response.content)
@@ -187,17 +345,43 @@ def local_tts(text):
     - text (str): The text to convert into speech.
     """
     try:
-        command = (
-            f'espeak-ng -s 140 -p 50 -v en-us+m3 "{text}" --stdout | '
-            f'sox -t wav - -c 1 -t wav - gain 0.0 reverb 30 highpass 500 lowpass 3000 | aplay'
-        )
-        os.system(command)
+        # espeak-ng | sox | aplay, wired with pipes directly (no shell, no quoting)
+        stages = [
+            ["espeak-ng", "-s", "140", "-p", "50", "-v", "en-us+m3", text, "--stdout"],
+            ["sox", "-t", "wav", "-", "-c", "1", "-t", "wav", "-",
+             "gain", "0.0", "reverb", "30", "highpass", "500", "lowpass", "3000"],
+            ["aplay"],
+        ]
+        processes = []
+        try:
+            for i, args in enumerate(stages):
+                processes.append(subprocess.Popen(
+                    args,
+                    stdin=processes[-1].stdout if processes else None,
+                    stdout=subprocess.PIPE if i < len(stages) - 1 else None
+                ))
+        except Exception:
+            # A later stage failed to start (e.g. sox missing): stop the ones already running
+            for process in processes:
+                process.kill()
+                if process.stdout:
+                    process.stdout.close()
+                process.wait()
+            raise
+
+        # Close the parent's copies so each stage sees EOF/SIGPIPE correctly
+        for process in processes[:-1]:
+            process.stdout.close()
+
+        for process in reversed(processes):
+            process.wait()
     except Exception as e:
         print(f"ERROR: Local TTS generation failed: {e}")
 
 def server_tts(text, ttsurl, tts_voice):
     """
     Generate TTS audio using a server-based TTS system.
+    The response is downloaded on a reader thread so network and playback overlap.
 
     Parameters:
     - text (str): The text to convert into speech.
@@ -214,17 +398,54 @@ def server_tts(text, ttsurl, tts_voice):
             'speaker_wav': tts_voice,
             'language': "en"
         }
-        headers = {'accept': 'audio/x-wav'}
 
-        response = requests.get(full_url, params=params, headers=headers, stream=True)
+        response = _SESSION.get(full_url, params=params, headers=WAV_HEADERS, stream=True, timeout=HTTP_TIMEOUT)
         response.raise_for_status()
 
-        # Pass the response content to play_audio_stream
+        # Bounded queue between the HTTP reader thread and playback (None marks the end)
+        chunks = queue.Queue(maxsize=TTS_QUEUE_CHUNKS)
+        playback_done = threading.Event()
+        end_received = threading.Event()
+
+        def read_response():
+            try:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if playback_done.is_set():
+                        break
+                    chunks.put(chunk)
+            except Exception as e:
+                if not playback_done.is_set():
+                    print(f"ERROR: Server TTS download failed: {e}")
+            finally:
+                chunks.put(None)
+
+        reader_thread = threading.Thread(target=read_response, name="TTSReaderThread", daemon=True)
+        reader_thread.start()
+
+        # Pass the queued response content to play_audio_stream
         def tts_stream():
-            for chunk in response.iter_content(chunk_size=chunk_size):
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    end_received.set()
+                    break
                 yield chunk
 
-        play_audio_stream(tts_stream())
+        try:
+            play_audio_stream(tts_stream())
+        finally:
+            # Close the response first so a reader blocked in iter_content is aborted
+            playback_done.set()
+            response.close()
+
+            # If playback stopped early, drain the queue so a reader blocked in put() wakes up
+            if not end_received.is_set():
+                try:
+                    while chunks.get(timeout=TTS_READER_STOP_TIMEOUT) is not None:
+                        pass
+                except queue.Empty:
+                    pass
+            reader_thread.join(timeout=TTS_READER_STOP_TIMEOUT)
     except Exception as e:
         print(f"ERROR: Server TTS generation failed: {e}")
 
@@ -9,11 +9,13 @@ communicates with a server endpoint for remote processing.
 """
 # === Standard Libraries ===
 import subprocess
+import platform
+import threading
 import traceback
+from functools import lru_cache
 from PIL import Image
 from transformers import BlipProcessor, BlipForConditionalGeneration
 from io import BytesIO
-import requests
 import torch
 import base64
 from datetime import datetime
@@ -21,37 +23,132 @@ from pathlib import Path
 
 # === Custom Modules ===
 from module_config import load_config
+from module_http import create_session
 
 # === Constants and Globals ===
-CONFIG = load_config()
-
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 MODEL_NAME = "Salesforce/blip-image-captioning-base"
+ARM_MACHINES = ("aarch64", "arm64", "armv7l")
+CAPTION_MAX_TOKENS = 30  # Captions rarely exceed 20 tokens
+BLIP_IMAGE_SIZE = (384, 384)  # Input resolution of the BLIP processor
+CAPTION_TIMEOUT = (5, 30)  # (connect, read) seconds for the vision server caption request
 
 # Cache directory for model
 CACHE_DIR = Path("./vision")
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
-# Globals for processor and model
-PROCESSOR = None
-MODEL = None
+# Session for the vision server, reusing a pooled keep-alive connection
+_SESSION = create_session(headers={'Accept': 'application/json'})
+
+# Guards the one-time BLIP load against concurrent callers
+_BLIP_LOCK = threading.Lock()
 
 # === Helper Functions ===
 
+@lru_cache(maxsize=1)
+def _load_blip():
+    """
+    Load the BLIP processor and model from the cache directory.
+    Cached, so the load only ever happens once.
+
+    Returns:
+    - tuple: (processor, model)
+    """
+    print(f"INFO: Initializing BLIP model...")
+    processor = BlipProcessor.from_pretrained(MODEL_NAME, cache_dir=str(CACHE_DIR))
+    model = BlipForConditionalGeneration.from_pretrained(MODEL_NAME, cache_dir=str(CACHE_DIR)).to(DEVICE)
+
+    # Inference only: no dropout and no autograd tracking on the weights
+    model.eval()
+    model.requires_grad_(False)
+
+    if DEVICE.type == 'cuda':
+        # Half precision on GPU; int8 dynamic quantization only has CPU kernels
+        model = model.half()
+    else:
+        # Use the QNNPACK int8 kernels (NEON-optimized) on ARM boards such as the Pi
+        if platform.machine() in ARM_MACHINES and 'qnnpack' in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = 'qnnpack'
+
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    print(f"INFO: BLIP model initialized.")
+    return processor, model
+
+
 def initialize_blip():
     """
     Initialize BLIP model and processor for detailed captions.
-    Ensures the model is loaded from the cache directory.
-    """
-    global PROCESSOR, MODEL
-    if not PROCESSOR or not MODEL:
-        print(f"INFO: Initializing BLIP model...")
-        PROCESSOR = BlipProcessor.from_pretrained(MODEL_NAME, cache_dir=str(CACHE_DIR))
-        MODEL = BlipForConditionalGeneration.from_pretrained(MODEL_NAME, cache_dir=str(CACHE_DIR)).to(DEVICE)
-        MODEL = torch.quantization.quantize_dynamic(
-            MODEL, {torch.nn.Linear}, dtype=torch.qint8
+    Safe to call from several threads; only the first call loads the model.
+
+    Returns:
+    - tuple: (processor, model)
+    """
+    with _BLIP_LOCK:
+        return _load_blip()
+
+
+def warm_up_blip():
+    """
+    Load BLIP and push a tiny JPEG through decode and preprocessing once,
+    so the first real caption does not pay for lazy imports and allocations.
+    """
+    processor, _ = initialize_blip()
+
+    jpeg_bytes = BytesIO()
+    Image.new('RGB', (1, 1)).save(jpeg_bytes, format='JPEG')
+    jpeg_bytes.seek(0)
+
+    processor(open_image(jpeg_bytes), return_tensors="pt")
+
+
+def open_image(image_bytes: BytesIO) -> Image.Image:
+    """
+    Open an image for captioning as RGB.
+    JPEGs are decoded at reduced scale (DCT downscaling) when larger than the BLIP input size.
+
+    Parameters:
+    - image_bytes (BytesIO): Encoded image in memory.
+
+    Returns:
+    - PIL.Image: Decoded RGB image.
+    """
+    image = Image.open(image_bytes)
+    image.draft('RGB', BLIP_IMAGE_SIZE)
+    return image.convert('RGB')
+
+
+def generate_caption(image) -> str:
+    """
+    Run BLIP on an image and decode the caption.
+    Uses greedy decoding unless more beams are configured in config.ini.
+
+    Parameters:
+    - image (PIL.Image): Image to caption.
+
+    Returns:
+    - str: Generated caption.
+    """
+    processor, model = initialize_blip()
+    num_beams = load_config()['VISION']['num_beams']
+
+    # Prepare inputs for the BLIP model
+    inputs = processor(image, return_tensors="pt").to(DEVICE)
+
+    # Match the fp16 weights of the GPU model
+    if DEVICE.type == 'cuda':
+        inputs['pixel_values'] = inputs['pixel_values'].half()
+
+    with torch.inference_mode():
+        outputs = model.generate(
+            **inputs,
+            max_new_tokens=CAPTION_MAX_TOKENS,
+            num_beams=num_beams,
+            do_sample=False,
+            early_stopping=num_beams > 1,
         )
-        print(f"INFO: BLIP model initialized.")
+    return processor.decode(outputs[0], skip_special_tokens=True)
 
 
 def capture_image() -> BytesIO:
@@ -62,8 +159,8 @@ def capture_image() -> BytesIO:
     - BytesIO: Captured image in memory.
     """
     try:
-        # Determine resolution from CONFIG
-        if CONFIG['VISION']['server_hosted']:
+        # Determine resolution from the config
+        if load_config()['VISION']['server_hosted']:
             width, height = "2592", "1944"  # High resolution for server processing
         else:
             width, height = "320", "240"   # Low resolution for on-device processing
@@ -77,6 +174,9 @@ def capture_image() -> BytesIO:
             "--timeout", "300",  # Short timeout
             "--width", width,
             "--height", height,
+            "--encoding", "jpg",  # Compressed JPEG keeps uploads small
+            "--quality", "85",
+            "--nopreview",  # No preview window
         ]
         process = subprocess.run(
             command,
@@ -102,11 +202,12 @@ def send_image_to_server(image_bytes: BytesIO) -> str:
     image_bytes.seek(0)
 
     try:
-        # Properly send the image as a file
-        files = {'image': ('image.jpg', image_bytes.getvalue(), 'image/jpeg')}
-        #print(f"DEBUG: Sending image to {CONFIG['VISION']['base_url']}/caption")
+        # Send the buffer itself as the file object; requests reads it into the multipart body
+        files = {'image': ('image.jpg', image_bytes, 'image/jpeg')}
+        base_url = load_config()['VISION']['base_url']
+        #print(f"DEBUG: Sending image to {base_url}/caption")
 
-        response = requests.post(f"{CONFIG['VISION']['base_url']}/caption", files=files)
+        response = _SESSION.post(f"{base_url}/caption", files=files, timeout=CAPTION_TIMEOUT)
 
         if response.status_code == 200:
             return response.json().get("caption", "No caption returned")
@@ -131,15 +232,10 @@ def get_image_caption_from_base64(base64_str):
     try:
         # Decode the base64 string into image bytes
         img_bytes = base64.b64decode(base64_str)
-        raw_image = Image.open(BytesIO(img_bytes)).convert('RGB')
+        raw_image = open_image(BytesIO(img_bytes))
 
-        # Prepare inputs for the BLIP model
-        inputs = PROCESSOR(raw_image, return_tensors="pt")
-        outputs = MODEL.generate(**inputs, max_new_tokens=100)
-
-        # Decode and return the generated caption
-        caption = PROCESSOR.decode(outputs[0], skip_special_tokens=True)
-        return caption
+        # Generate, decode and return the caption
+        return generate_caption(raw_image)
     except Exception as e:
         raise RuntimeError(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ERROR: Error generating caption from base64: {e}")
 
@@ -155,18 +251,13 @@ def describe_camera_view() -> str:
         # Capture the image
         image_bytes = capture_image()
 
-        if CONFIG['VISION']['server_hosted']:
+        if load_config()['VISION']['server_hosted']:
             # Use server-hosted vision processing
             return send_image_to_server(image_bytes)
         else:
             # Use on-device BLIP model for captioning
-            initialize_blip()
-            image = Image.open(image_bytes)
-            inputs = PROCESSOR(image, return_tensors="pt").to(DEVICE)
-
-            outputs = MODEL.generate(**inputs, max_new_tokens=50, num_beams=5)
-            caption = PROCESSOR.decode(outputs[0], skip_special_tokens=True)
-            return caption
+            image = open_image(image_bytes)
+            return generate_caption(image)
     except Exception as e:
         print(f"TARS is uable to see right now")
         return f"Error: {e}"
\ No newline at end of file
@@ -7,6 +7,8 @@ This module handles voice command processing for robot movement control,
 mapping natural language commands to servo control functions.
 """
 
+import re
+
 from module_servoctl import (
     height_neutral_to_up,
     torso_neutral_to_forwards,
@@ -143,9 +145,31 @@ MOVEMENT_COMMANDS = {
     }
 }
 
+# Flat phrase -> (function, response) lookup built once from MOVEMENT_COMMANDS
+_DISPATCH = {}
+for cmd, details in MOVEMENT_COMMANDS.items():
+    for phrase in [cmd, *details["aliases"]]:
+        _DISPATCH[phrase.casefold()] = (details["function"], details["response"])
+
+# Only multi-word phrases may match inside a longer utterance; single words such as
+# "lower" or "rise" are too common in normal speech and stay exact-match only.
+# Scanned with one alternation (longest first) so an utterance is read once.
+_EMBEDDED_PHRASES = [phrase for phrase in _DISPATCH if len(phrase.split()) > 1]
+_PHRASE_PATTERN = re.compile(
+    r"\b(" + "|".join(map(re.escape, sorted(_EMBEDDED_PHRASES, key=len, reverse=True))) + r")\b"
+)
+
+# A negation right before an embedded phrase ("don't move forward") cancels the match
+_NEGATION_PATTERN = re.compile(r"\b(?:don't|dont|do not|never|stop)\s*$")
+
 def process_movement_command(command: str) -> tuple[bool, str]:
     """
     Process a movement command and execute the corresponding function.
+    The command may be an exact phrase or alias. A multi-word phrase may also
+    match inside a short utterance (e.g. "please step forward now") as long as
+    it makes up at least half of the utterance's words, so ordinary sentences
+    like "I need to get up early" still go to the LLM. A phrase preceded by a
+    negation (e.g. "don't move forward", "do not sit down") is never executed.
     
     Parameters:
     - command (str): The voice command to process
@@ -153,16 +177,23 @@ def process_movement_command(command: str) -> tuple[bool, str]:
     Returns:
     - tuple[bool, str]: Success status and response message
     """
-    # Convert command to lowercase for matching
-    command = command.lower().strip()
+    # Normalize case and trailing punctuation for matching
+    command = command.casefold().strip().rstrip(".,!?;:").strip()
     
-    # Check direct commands and aliases
-    for cmd, details in MOVEMENT_COMMANDS.items():
-        if command == cmd or command in details["aliases"]:
-            try:
-                details["function"]()
-                return True, details["response"]
-            except Exception as e:
-                return False, f"Error executing movement: {str(e)}"
+    # Look up direct commands and aliases, falling back to a phrase inside the utterance
+    hit = _DISPATCH.get(command)
+    if not hit:
+        match = _PHRASE_PATTERN.search(command)
+        if (match
+                and 2 * len(match.group(1).split()) >= len(command.split())
+                and not _NEGATION_PATTERN.search(command, 0, match.start())):
+            hit = _DISPATCH[match.group(1)]
+    if hit:
+        function, response = hit
+        try:
+            function()
+            return True, response
+        except Exception as e:
+            return False, f"Error executing movement: {str(e)}"
     
     return False, "Command not recognized."
\ No newline at end of file